@@ -1,9 +1,27 @@
-from moviepy import VideoFileClip, ImageClip, TextClip, CompositeVideoClip
+"""Wasserzeichen-Tool für Videos und Bilder
+
+Aufruf:
+    python "version 3.py"                          interaktiver Modus
+    python "version 3.py" --vergleich video.mp4    Backends vergleichen (PSNR/SSIM, Drift, Speedup)
+    python "version 3.py" --selbsttest             Vergleichs-Harness selbst prüfen
+
+Der Vergleich schreibt die Ausgaben und den Bericht <video>_vergleich.json
+ins aktuelle Verzeichnis; weitere Optionen mit --help.
+"""
+from moviepy import AudioClip, VideoClip, VideoFileClip, ImageClip, TextClip, CompositeVideoClip
 import cv2
 import numpy as np
+import argparse
+import json
 import os
+import queue
+import sys
+import tempfile
+import threading
+import time
 from typing import Tuple, Optional
 from PIL import ImageFont
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
 
 
 class FontManager:
@@ -160,6 +178,11 @@ class FileScanner:
 
 
 class UserInput:
+    @staticmethod
+    def ask_renditions() -> bool:
+        answer = input("Mehrere Auflösungen exportieren (1080p/720p/480p)? (j/n): ")
+        return answer.strip().lower() in ("j", "ja", "y", "yes")
+
     @staticmethod
     def ask_opacity() -> float:
         while True:
@@ -221,7 +244,7 @@ class MediaLoader:
 class WatermarkCreator:
     def __init__(self, text: str, opacity: float,
                  position: Tuple[int, int], scale: float,
-                 bg_color: str = "rgba(0,0,0,0.5)"):
+                 bg_color: Tuple[int, int, int, int] = (0, 0, 0, 128)):
         self.text = text
         self.opacity = opacity
         self.position = position
@@ -273,8 +296,8 @@ class WatermarkCreator:
             print(f"⚠️  Font-Fehler, verwende einfache Version: {e}")
             # Fallback: Einfaches TextClip
             return TextClip(
-                txt=self.text,
-                fontsize=font_size,
+                text=self.text,
+                font_size=font_size,
                 color='white'
             ).with_opacity(self.opacity).with_position(self.position).with_duration(1)
 
@@ -289,7 +312,7 @@ class WatermarkCreator:
             logo = (
                 ImageClip(logo_path)
                 .with_opacity(self.opacity)
-                .resize(self.scale)
+                .resized(self.scale)
                 .with_position(logo_position)
             )
             return logo
@@ -298,12 +321,44 @@ class WatermarkCreator:
             return None
 
 
+class Rendition:
+    """Beschreibt eine Ausgabe-Variante (Auflösung, Codec, Bitrate, Container)"""
+
+    def __init__(self, height: int, codec: str = "libx264", bitrate: str = "5000k",
+                 container: str = "mp4", audio_codec: str = "aac"):
+        self.height = height
+        self.codec = codec
+        self.bitrate = bitrate
+        self.container = container
+        self.audio_codec = audio_codec
+
+    @property
+    def label(self) -> str:
+        return f"{self.height}p"
+
+    def target_size(self, source_size: Tuple[int, int]) -> Tuple[int, int]:
+        # Seitenverhältnis beibehalten, Breite gerade halten (yuv420p)
+        src_width, src_height = source_size
+        width = int(round(src_width * self.height / src_height / 2)) * 2
+        return (width, self.height)
+
+    def filename(self, output_name: str) -> str:
+        return f"{output_name}_{self.label}.{self.container}"
+
+
+DEFAULT_RENDITIONS = [
+    Rendition(1080, bitrate="5000k"),
+    Rendition(720, bitrate="2500k"),
+    Rendition(480, bitrate="1000k"),
+]
+
+
 class Exporter:
     @staticmethod
-    def export(background, watermark_clips, output_name: str, media_type: str):
+    def export(background, watermark_clips, output_name: str, media_type: str,
+               fps: int = 24, fallback: bool = True):
         if media_type == "video":
-            for clip in watermark_clips:
-                clip = clip.with_duration(background.duration)
+            watermark_clips = [clip.with_duration(background.duration) for clip in watermark_clips]
 
             final = CompositeVideoClip([background] + watermark_clips)
 
@@ -311,24 +366,509 @@ class Exporter:
             try:
                 final.write_videofile(
                     f"{output_name}.mp4",
-                    fps=24,
+                    fps=fps,
                     codec="libx264",
                     audio_codec="aac",
-                    verbose=False,
                     logger=None
                 )
             except Exception as e:
+                if not fallback:
+                    raise
                 print(f"⚠️  Video-Export-Fehler: {e}")
                 print("Versuche alternative Einstellungen...")
                 final.write_videofile(
                     f"{output_name}.mp4",
-                    fps=24
+                    fps=fps
                 )
         else:
             final = CompositeVideoClip([background] + watermark_clips)
             final.save_frame(f"{output_name}.png")
             print(f"📸 Bild gespeichert als: {output_name}.png")
 
+    @staticmethod
+    def export_renditions(background, watermark_clips, output_name: str,
+                          renditions: Optional[list] = None, fps: int = 24) -> list:
+        """Dekodiert und blendet einmal, verteilt die Frames an mehrere Encoder"""
+        if renditions is None:
+            renditions = DEFAULT_RENDITIONS
+
+        watermark_clips = [clip.with_duration(background.duration) for clip in watermark_clips]
+        final = CompositeVideoClip([background] + watermark_clips)
+
+        # Nicht hochskalieren: größere Varianten als die Quelle überspringen
+        source_height = final.size[1]
+        active = []
+        for rendition in renditions:
+            if rendition.height > source_height:
+                print(f"⚠️  {rendition.label} übersprungen (Quelle nur {source_height}p)")
+            else:
+                active.append(rendition)
+        if not active:
+            raise ValueError("Keine passende Auflösung für diese Quelle!")
+
+        audio_path = None
+        writers = []
+        workers = []
+        errors = []
+        try:
+            # Audio nur einmal schreiben, jeder Encoder kodiert es selbst
+            if final.audio is not None:
+                audio_path = f"{output_name}_TEMP_audio.wav"
+                final.audio.write_audiofile(audio_path, fps=44100, codec="pcm_s16le", logger=None)
+
+            try:
+                for rendition in active:
+                    size = rendition.target_size(final.size)
+                    writer = FFMPEG_VideoWriter(
+                        rendition.filename(output_name),
+                        size,
+                        fps,
+                        codec=rendition.codec,
+                        bitrate=rendition.bitrate,
+                        audiofile=audio_path,
+                        audio_codec=rendition.audio_codec,
+                    )
+                    writers.append((rendition, writer))
+
+                    frames = queue.Queue(maxsize=8)
+                    worker = threading.Thread(
+                        target=Exporter._encode_worker,
+                        args=(writer, size, frames, rendition, errors),
+                        daemon=True,
+                    )
+                    worker.start()
+                    workers.append((worker, frames))
+
+                print(f"🎞️  Exportiere {len(active)} Varianten: "
+                      f"{', '.join(r.label for r in active)}")
+
+                for frame in final.iter_frames(fps=fps, dtype="uint8"):
+                    for _, frames in workers:
+                        frames.put(frame)
+            finally:
+                for _, frames in workers:
+                    frames.put(None)
+                for worker, _ in workers:
+                    worker.join()
+                # Jeden Encoder einzeln schließen, ein Fehler darf die anderen nicht blockieren
+                for rendition, writer in writers:
+                    try:
+                        writer.close()
+                    except Exception as e:
+                        if rendition not in [failed for failed, _ in errors]:
+                            errors.append((rendition, e))
+        finally:
+            if audio_path and os.path.exists(audio_path):
+                os.remove(audio_path)
+
+        # Abgebrochene Ausgaben entfernen, damit keine kaputte Datei ausgeliefert wird
+        for rendition, error in errors:
+            print(f"❌ {rendition.label} fehlgeschlagen: {error}")
+            if os.path.exists(rendition.filename(output_name)):
+                os.remove(rendition.filename(output_name))
+
+        failed = [rendition for rendition, _ in errors]
+        written = [rendition.filename(output_name) for rendition in active
+                   if rendition not in failed]
+        if not written:
+            raise RuntimeError("Alle Varianten sind fehlgeschlagen!")
+        for filename in written:
+            print(f"🎬 Video gespeichert als: {filename}")
+        return written
+
+    @staticmethod
+    def _encode_worker(writer, size: Tuple[int, int], frames: queue.Queue,
+                       rendition: Rendition, errors: list) -> None:
+        failed = False
+        while True:
+            frame = frames.get()
+            if frame is None:
+                break
+            # Nach einem Fehler weiter leeren, damit der Decoder nicht blockiert
+            if failed:
+                continue
+            try:
+                if (frame.shape[1], frame.shape[0]) != size:
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                writer.write_frame(frame)
+            except Exception as e:
+                errors.append((rendition, e))
+                failed = True
+
+
+class QualityMetrics:
+    """Vektorisierte Bildmetriken für Frame-Blöcke der Form (N, H, W, 3)"""
+
+    @staticmethod
+    def psnr(reference: np.ndarray, test: np.ndarray) -> np.ndarray:
+        diff = reference.astype(np.float32) - test.astype(np.float32)
+        mse = np.mean(diff * diff, axis=(1, 2, 3))
+        # Identische Frames: PSNR auf 100 dB begrenzen statt unendlich
+        with np.errstate(divide="ignore"):
+            values = 10 * np.log10(255.0 ** 2 / mse)
+        return np.minimum(values, 100.0)
+
+    @staticmethod
+    def ssim(reference: np.ndarray, test: np.ndarray) -> np.ndarray:
+        c1 = (0.01 * 255) ** 2
+        c2 = (0.03 * 255) ** 2
+        weights = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+        # Graustufen, Frames als Kanäle (H, W, N) -> ein Gauß-Filter für den ganzen Block
+        x = np.ascontiguousarray(np.moveaxis(reference.astype(np.float32) @ weights, 0, -1))
+        y = np.ascontiguousarray(np.moveaxis(test.astype(np.float32) @ weights, 0, -1))
+
+        def blur(image):
+            return cv2.GaussianBlur(image, (11, 11), 1.5).reshape(image.shape)
+
+        mu_x = blur(x)
+        mu_y = blur(y)
+        sigma_x = blur(x * x) - mu_x * mu_x
+        sigma_y = blur(y * y) - mu_y * mu_y
+        sigma_xy = blur(x * y) - mu_x * mu_y
+
+        ssim_map = ((2 * mu_x * mu_y + c1) * (2 * sigma_xy + c2)) / \
+                   ((mu_x * mu_x + mu_y * mu_y + c1) * (sigma_x + sigma_y + c2))
+        return ssim_map.mean(axis=(0, 1))
+
+    @staticmethod
+    def watermark_drift(reference: np.ndarray, test: np.ndarray, background: np.ndarray,
+                        region: Tuple[int, int, int, int], box: Tuple[int, int, int, int],
+                        level: float = 2.0):
+        """Vergleicht das Wasserzeichen beider Ausgaben in derselben Region
+
+        `box` ist das bekannte Wasserzeichen-Rechteck, `region` dasselbe plus Suchradius.
+        Gibt pro Frame Verschiebung (dx, dy), relative Deckkraft (Test/Referenz)
+        und eine Timing-Abweichung zurück.
+        """
+        x0, y0, x1, y1 = region
+        bx0, by0, bx1, by1 = box[0] - x0, box[1] - y0, box[2] - x0, box[3] - y0
+        weights = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+        # Wasserzeichen-Signal = Ausgabe minus Quelle, beide in derselben Region
+        source = background[:, y0:y1, x0:x1].astype(np.float32) @ weights
+        ref_signal = reference[:, y0:y1, x0:x1].astype(np.float32) @ weights - source
+        test_signal = test[:, y0:y1, x0:x1].astype(np.float32) @ weights - source
+
+        # Sichtbarkeit im bekannten Rechteck messen, nicht verdünnt durch den Suchradius
+        ref_box = ref_signal[:, by0:by1, bx0:bx1]
+        test_box = test_signal[:, by0:by1, bx0:bx1]
+        ref_rms = np.sqrt(np.mean(ref_box * ref_box, axis=(1, 2)))
+        test_rms = np.sqrt(np.mean(test_box * test_box, axis=(1, 2)))
+
+        # Hysterese: nur eindeutig sichtbar gegen eindeutig unsichtbar zählt als Timing-Fehler
+        timing = ((ref_rms > level) & (test_rms < level / 2)) | \
+                 ((test_rms > level) & (ref_rms < level / 2))
+
+        shift = np.zeros((len(reference), 2))
+        alpha = np.ones(len(reference))
+        size = (x1 - x0, y1 - y0)
+        window = cv2.createHanningWindow(size, cv2.CV_32F)
+        # Messen, sobald die Referenz sichtbar ist; eindeutige Aussetzer zählen nur als Timing
+        for i in np.flatnonzero((ref_rms > level) & ~timing):
+            (dx, dy), _ = cv2.phaseCorrelate(ref_signal[i], test_signal[i], window)
+            shift[i] = (dx, dy)
+
+            # Test zurückschieben, dann Deckkraft per kleinster Quadrate: test ≈ alpha * ref
+            back = np.float32([[1, 0, -dx], [0, 1, -dy]])
+            aligned = cv2.warpAffine(test_signal[i], back, size)
+            alpha[i] = float((ref_signal[i] * aligned).sum() / (ref_signal[i] ** 2).sum())
+        return shift, alpha, timing
+
+
+class BackendComparison:
+    """Rendert denselben Auftrag mit mehreren Backends und vergleicht Frame für Frame"""
+
+    def __init__(self, source: str, creator: WatermarkCreator,
+                 logo_path: Optional[str] = None, backends: Optional[dict] = None,
+                 reference: str = "composite", fps: int = 24, chunk_size: int = 8,
+                 position_tolerance: float = 2.0, opacity_tolerance: float = 0.05,
+                 search_radius: int = 32, repeats: int = 2):
+        self.source = source
+        self.creator = creator
+        self.logo_path = logo_path
+        self.backends = backends if backends is not None else {
+            "composite": BackendComparison.run_composite,
+            "renditions": BackendComparison.run_renditions,
+        }
+        if reference not in self.backends:
+            raise ValueError(f"Referenz-Backend fehlt: {reference}")
+        self.reference = reference
+        self.fps = fps
+        self.chunk_size = chunk_size
+        self.position_tolerance = position_tolerance
+        self.opacity_tolerance = opacity_tolerance
+        self.search_radius = search_radius
+        self.repeats = max(repeats, 1)
+
+    @staticmethod
+    def run_composite(background, watermark_clips, output_name: str, fps: int) -> str:
+        # Ohne Fallback: ein fehlgeschlagener Referenz-Export soll den Vergleich abbrechen
+        Exporter.export(background, watermark_clips, output_name, "video",
+                        fps=fps, fallback=False)
+        return f"{output_name}.mp4"
+
+    @staticmethod
+    def run_renditions(background, watermark_clips, output_name: str, fps: int) -> str:
+        # Eine Variante in Quellauflösung, damit die Frames direkt vergleichbar sind
+        rendition = Rendition(background.size[1])
+        return Exporter.export_renditions(background, watermark_clips,
+                                          output_name, [rendition], fps=fps)[0]
+
+    def build_watermarks(self) -> list:
+        watermark_clips = [self.creator.create_text()]
+        if self.logo_path:
+            logo_clip = self.creator.create_logo(self.logo_path)
+            if logo_clip:
+                watermark_clips.append(logo_clip)
+        return watermark_clips
+
+    def watermark_region(self, size: Tuple[int, int]):
+        """Bekanntes Rechteck aller Wasserzeichen und dasselbe plus Suchradius, im Bild begrenzt"""
+        watermark_clips = self.build_watermarks()
+        try:
+            boxes = []
+            for clip in watermark_clips:
+                x, y = clip.pos(0)
+                boxes.append((int(x), int(y), int(x) + clip.size[0], int(y) + clip.size[1]))
+        finally:
+            for clip in watermark_clips:
+                clip.close()
+
+        x0 = max(min(box[0] for box in boxes), 0)
+        y0 = max(min(box[1] for box in boxes), 0)
+        x1 = min(max(box[2] for box in boxes), size[0])
+        y1 = min(max(box[3] for box in boxes), size[1])
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            raise ValueError("Wasserzeichen liegt außerhalb des Bildes!")
+
+        r = self.search_radius
+        region = (max(x0 - r, 0), max(y0 - r, 0), min(x1 + r, size[0]), min(y1 + r, size[1]))
+        return region, (x0, y0, x1, y1)
+
+    def render(self, name: str, output_name: str) -> Tuple[str, float]:
+        media_type, background, _ = MediaLoader.load(self.source)
+        if media_type != "video":
+            background.close()
+            raise ValueError("Backend-Vergleich nur für Videos möglich!")
+        watermark_clips = []
+        try:
+            watermark_clips = self.build_watermarks()
+
+            start = time.perf_counter()
+            # Alle Backends mit derselben Bildrate rendern, mit der compare() liest
+            filename = self.backends[name](background, watermark_clips,
+                                           f"{output_name}_{name}", self.fps)
+            seconds = time.perf_counter() - start
+        finally:
+            background.close()
+            for clip in watermark_clips:
+                clip.close()
+        return filename, seconds
+
+    def _chunks(self, filename: str, size: Tuple[int, int]):
+        clip = VideoFileClip(filename)
+        try:
+            block = []
+            for frame in clip.iter_frames(fps=self.fps, dtype="uint8"):
+                if (frame.shape[1], frame.shape[0]) != size:
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                block.append(frame)
+                if len(block) == self.chunk_size:
+                    yield np.stack(block)
+                    block = []
+            if block:
+                yield np.stack(block)
+        finally:
+            clip.close()
+
+    def compare(self, reference_file: str, test_file: str) -> dict:
+        with VideoFileClip(self.source) as source_clip:
+            size = tuple(source_clip.size)
+        region, box = self.watermark_region(size)
+
+        psnr, ssim = [], []
+        position_drift, opacity_drift = [], []
+        timing_frames = 0
+        compared = 0
+
+        streams = zip(self._chunks(self.source, size),
+                      self._chunks(reference_file, size),
+                      self._chunks(test_file, size))
+        for background, reference, test in streams:
+            n = min(len(background), len(reference), len(test))
+            background, reference, test = background[:n], reference[:n], test[:n]
+            compared += n
+
+            psnr.append(QualityMetrics.psnr(reference, test))
+            ssim.append(QualityMetrics.ssim(reference, test))
+
+            shift, alpha, timing = QualityMetrics.watermark_drift(
+                reference, test, background, region, box)
+            timing_frames += int(np.count_nonzero(timing))
+            position_drift.append(np.hypot(shift[:, 0], shift[:, 1]))
+            # Absolute Abweichung der Deckkraft: bei schwachen Wasserzeichen bläht Rauschen das Verhältnis auf
+            opacity_drift.append(np.abs(alpha - 1.0) * self.creator.opacity)
+
+        frames = {"reference": self._frame_count(reference_file),
+                  "test": self._frame_count(test_file),
+                  "compared": compared}
+
+        psnr = np.concatenate(psnr) if psnr else np.zeros(0)
+        ssim = np.concatenate(ssim) if ssim else np.zeros(0)
+        position_drift = np.concatenate(position_drift) if position_drift else np.zeros(0)
+        opacity_drift = np.concatenate(opacity_drift) if opacity_drift else np.zeros(0)
+
+        flags = []
+        if frames["reference"] != frames["test"]:
+            flags.append(f"Frame-Anzahl: {frames['reference']} vs {frames['test']}")
+        if timing_frames:
+            flags.append(f"Timing: {timing_frames} Frames mit abweichender Sichtbarkeit")
+        if position_drift.size and position_drift.max() > self.position_tolerance:
+            flags.append(f"Position: bis zu {position_drift.max():.1f} px verschoben")
+        if opacity_drift.size and opacity_drift.max() > self.opacity_tolerance:
+            flags.append(f"Deckkraft: bis zu {opacity_drift.max() * 100:.0f} Prozentpunkte abweichend")
+
+        return {
+            "frames": frames,
+            "psnr_mean": float(psnr.mean()) if psnr.size else None,
+            "psnr_min": float(psnr.min()) if psnr.size else None,
+            "ssim_mean": float(ssim.mean()) if ssim.size else None,
+            "ssim_min": float(ssim.min()) if ssim.size else None,
+            "position_drift_max": float(position_drift.max()) if position_drift.size else 0.0,
+            "opacity_drift_max": float(opacity_drift.max()) if opacity_drift.size else 0.0,
+            "timing_drift_frames": timing_frames,
+            "flags": flags,
+        }
+
+    def warm_up(self) -> None:
+        """Quelle einmal lesen und dekodieren, damit kein Backend vom OS-Cache profitiert"""
+        with open(self.source, "rb") as f:
+            while f.read(1024 * 1024):
+                pass
+        with VideoFileClip(self.source) as clip:
+            clip.get_frame(0)
+
+    def _frame_count(self, filename: str) -> int:
+        with VideoFileClip(filename) as clip:
+            return int(round(clip.duration * self.fps))
+
+    def run(self, output_name: str) -> dict:
+        print(f"\n🔬 Backend-Vergleich für: {self.source}")
+        self.warm_up()
+
+        names = list(self.backends)
+        runs = {name: [] for name in names}
+        files = {}
+        for round_index in range(self.repeats):
+            # Reihenfolge abwechseln, damit kein Backend immer als erstes oder letztes läuft
+            order = names if round_index % 2 == 0 else names[::-1]
+            for name in order:
+                print(f"⏱️  Rendere mit Backend '{name}' (Lauf {round_index + 1}/{self.repeats})...")
+                files[name], seconds = self.render(name, output_name)
+                runs[name].append(seconds)
+
+        # Bester Lauf je Backend, Ausreißer durch andere Prozesse fallen so heraus
+        timings = {name: min(values) for name, values in runs.items()}
+
+        report = {"source": self.source, "reference": self.reference,
+                  "repeats": self.repeats, "backends": {}}
+        for name in names:
+            entry = {
+                "file": files[name],
+                "seconds": round(timings[name], 3),
+                "runs": [round(value, 3) for value in runs[name]],
+                "speedup": round(timings[self.reference] / timings[name], 2),
+            }
+            if name != self.reference:
+                entry.update(self.compare(files[self.reference], files[name]))
+            report["backends"][name] = entry
+
+        report_file = f"{output_name}_vergleich.json"
+        with open(report_file, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        self.print_report(report)
+        print(f"📄 Bericht gespeichert als: {report_file}")
+        return report
+
+    @staticmethod
+    def self_check(shift: int = 10) -> bool:
+        """Prüft den Vergleich selbst: gleiche Backends ohne Befund, Verschiebung um ca. shift px"""
+        def gradient(t):
+            x = np.linspace(0, 255, 640, dtype=np.float32)[None, :]
+            y = np.linspace(0, 255, 360, dtype=np.float32)[:, None]
+            red = (x + 40 * t) % 256
+            green = np.broadcast_to(y, (360, 640))
+            blue = np.full((360, 640), 96, dtype=np.float32)
+            return np.dstack([red * np.ones_like(green), green, blue]).astype(np.uint8)
+
+        def shifted(background, watermark_clips, output_name, fps):
+            moved = [clip.with_position((clip.pos(0)[0] + shift, clip.pos(0)[1]))
+                     for clip in watermark_clips]
+            return BackendComparison.run_renditions(background, moved, output_name, fps)
+
+        def tone(t):
+            wave = 0.2 * np.sin(2 * np.pi * 440 * np.asarray(t))
+            return np.stack([wave, wave], axis=-1)
+
+        with tempfile.TemporaryDirectory() as folder:
+            source = os.path.join(folder, "quelle.mp4")
+            audio = AudioClip(tone, duration=1, fps=44100)
+            VideoClip(gradient, duration=1).with_audio(audio).write_videofile(
+                source, fps=24, logger=None)
+
+            comparison = BackendComparison(
+                source,
+                WatermarkCreator("HAW Hamburg", 0.6, (120, 80), 1.0),
+                backends={
+                    "composite": BackendComparison.run_composite,
+                    "renditions": BackendComparison.run_renditions,
+                    "verschoben": shifted,
+                },
+            )
+            report = comparison.run(os.path.join(folder, "selbsttest"))
+
+            # Schwaches Wasserzeichen: hier dominiert Encoder-Rauschen das Signal
+            faint = BackendComparison(
+                source,
+                WatermarkCreator("HAW Hamburg", 0.1, (120, 80), 1.0),
+                backends={
+                    "composite": BackendComparison.run_composite,
+                    "renditions": BackendComparison.run_renditions,
+                },
+            )
+            faint_report = faint.run(os.path.join(folder, "selbsttest_schwach"))
+
+        same = report["backends"]["renditions"]
+        moved = report["backends"]["verschoben"]
+        faint_same = faint_report["backends"]["renditions"]
+        checks = [
+            ("Gleiche Ausgabe ohne Befund", not same["flags"]),
+            ("Gleiche Ausgabe bei 10% Deckkraft ohne Befund", not faint_same["flags"]),
+            (f"Verschiebung um {shift} px erkannt ({moved['position_drift_max']:.1f} px)",
+             abs(moved["position_drift_max"] - shift) <= 1.0),
+            ("Deckkraft bei Verschiebung unverändert",
+             moved["opacity_drift_max"] <= comparison.opacity_tolerance),
+            ("Kein Timing-Fehler bei Verschiebung", moved["timing_drift_frames"] == 0),
+        ]
+        for label, ok in checks:
+            print(f"{'✅' if ok else '❌'} {label}")
+        return all(ok for _, ok in checks)
+
+    @staticmethod
+    def print_report(report: dict) -> None:
+        print("\n" + "-" * 60)
+        print(f"{'Backend':<14}{'Zeit':>8}{'Speedup':>9}{'PSNR':>9}{'SSIM':>8}")
+        print("-" * 60)
+        for name, entry in report["backends"].items():
+            psnr = f"{entry['psnr_mean']:.2f}" if entry.get("psnr_mean") is not None else "-"
+            ssim = f"{entry['ssim_mean']:.4f}" if entry.get("ssim_mean") is not None else "-"
+            print(f"{name:<14}{entry['seconds']:>7.2f}s{entry['speedup']:>8.2f}x{psnr:>9}{ssim:>8}")
+            for flag in entry.get("flags", []):
+                print(f"  ⚠️  {flag}")
+        print("-" * 60)
+
 
 def main():
     print("\n" + "=" * 60)
@@ -384,7 +924,10 @@ def main():
         output_name = f"{os.path.splitext(selected_file)[0]}_wasserzeichen"
 
         print(f"\n💾 Exportiere als: {output_name}...")
-        Exporter.export(background, watermark_clips, output_name, media_type)
+        if media_type == "video" and UserInput.ask_renditions():
+            Exporter.export_renditions(background, watermark_clips, output_name)
+        else:
+            Exporter.export(background, watermark_clips, output_name, media_type)
 
         print("✅ Fertig! Ergebnis wurde gespeichert.")
 
@@ -409,6 +952,45 @@ def main():
         print(f"❌ Fehler: {e}")
 
 
+def vergleich_main(argv: list) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python "version 3.py"',
+        description="Vergleicht Export-Backends Frame für Frame mit dem CompositeVideoClip-Export",
+    )
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--vergleich", metavar="DATEI", help="Quellvideo für den Vergleich")
+    mode.add_argument("--selbsttest", action="store_true",
+                      help="Harness mit synthetischem Video und bekannter Verschiebung prüfen")
+    parser.add_argument("--text", default="HAW Hamburg", help="Wasserzeichen-Text")
+    parser.add_argument("--transparenz", type=int, default=50, help="Deckkraft 0-100%%")
+    parser.add_argument("--position", type=int, nargs=2, default=(100, 100), metavar=("X", "Y"))
+    parser.add_argument("--groesse", type=float, default=1.0, help="Skalierung des Wasserzeichens")
+    parser.add_argument("--logo", help="Optionales Logo (PNG/JPG)")
+    parser.add_argument("--wiederholungen", type=int, default=2,
+                        help="Messläufe pro Backend (Reihenfolge wechselt)")
+    parser.add_argument("--fps", type=int, default=24, help="Bildrate für Export und Vergleich")
+    args = parser.parse_args(argv)
+
+    if args.selbsttest:
+        return 0 if BackendComparison.self_check() else 1
+
+    if not os.path.exists(args.vergleich):
+        print(f"❌ Datei nicht gefunden: {args.vergleich}")
+        return 1
+
+    creator = WatermarkCreator(args.text, args.transparenz / 100,
+                               tuple(args.position), args.groesse)
+    comparison = BackendComparison(args.vergleich, creator, logo_path=args.logo,
+                                   fps=args.fps, repeats=args.wiederholungen)
+    try:
+        report = comparison.run(os.path.splitext(args.vergleich)[0])
+    except Exception as e:
+        print(f"❌ Vergleich abgebrochen: {e}")
+        return 1
+    flagged = any(entry.get("flags") for entry in report["backends"].values())
+    return 1 if flagged else 0
+
+
 if __name__ == "__main__":
     # Installation prüfen
     try:
@@ -423,6 +1005,8 @@ if __name__ == "__main__":
         except:
             print("⚠️  Font 'Arial' nicht verfügbar")
 
+        if len(sys.argv) > 1:
+            sys.exit(vergleich_main(sys.argv[1:]))
         main()
     except ImportError as e:
         print(f"❌ Fehlende Abhängigkeit: {e}")